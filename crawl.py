@@ -11,9 +11,9 @@ from models import Sitemap
 
 if __name__ == '__main__':
     domain = \
-        raw_input('Enter the base URL you want to crawl (include "http://"): ')
+        input('Enter the base URL you want to crawl (include "http://"): ')
     
-    print 'Crawling %s ...' % domain
+    print('Crawling %s ...' % domain)
     sitemap = Sitemap(domain)
-    print 'Done.'
-    print sitemap
+    print('Done.')
+    print(sitemap)
@@ -1,108 +1,241 @@
-from collections import deque, OrderedDict
-from copy import copy
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache
+import logging
+import multiprocessing
 import re
-from urlparse import urlsplit, urlunsplit, urljoin
+from threading import Lock
+import time
+from urllib.parse import urlsplit, urljoin
 
 import requests
-import logging
+from requests.adapters import HTTPAdapter
 
 import errors
 
 
 # regex
-HtmlTitleTagRegex = re.compile(r'<title>(?P<title>.+)</title>', \
-                            re.IGNORECASE | re.DOTALL)
-HtmlHrefAttrRegex = re.compile( \
-            r'<(?P<tag>[a-z]+)(?: rel=[\'"](?P<rel>[^\'"]+)[\'"])?[^<]* href=[\'"](?P<href>[^\'"]+)[\'"][^>]*>(?:<span [^>]*>(?:</span>)?)*(?P<text>[^<]*)', re.IGNORECASE)
-HtmlSrcAttrRegex = re.compile( \
-            r'<(?P<tag>[a-z]+)[^<]* src=[\'"](?P<src>[^\'"]+)[\'"][^>]*>', re.IGNORECASE)
-HtmlActionAttrRegex = re.compile( \
-            r'<(?P<tag>[a-z]+)[^<]* (?:form)?action=[\'"](?P<action>[^\'"]+)[\'"][^>]*>', re.IGNORECASE)
+# <title> tags & tags with URL attributes (href, src or (form)action),
+# matched in one pass. Attributes may be separated by any whitespace.
+HtmlTagRegex = re.compile( \
+            r'(?i)<title>(?P<title>[^<]+)</title>' \
+            r'|<(?P<tag>[a-z]+)(?:\srel=[\'"](?P<rel>[^\'"]+)[\'"])?(?P<attrs>[^<]*\s(?:href|src|(?:form)?action)=[\'"][^\'"]+[\'"])[^<>]*>(?:<span [^>]*>(?:</span>)?)*(?P<text>[^<]*)')
+# every URL attribute of a tag matched by HtmlTagRegex
+UrlAttrRegex = re.compile( \
+            r'(?i)\s(href|src|(?:form)?action)=[\'"]([^\'"]+)[\'"]')
+# URLs that do not point to a page or file (e-mail, phone, scripts, inline
+# data), ignored before any further work
+NonPageUrlRegex = re.compile(r'(?i)^\s*(?:mailto|tel|javascript|data):')
+# paths of static (non-HTML) files, never worth fetching
+StaticFileRegex = re.compile( \
+            r'(?i)\.(?:pdf|zip|tar|gz|7z|jpe?g|png|gif|svg|webp|ico|mp3|mp4|webm|avi|mov|css|js|woff2?|ttf|eot)$')
 
+# parsing
+UrlCacheSize = 100000 # max. number of normalized URLs memoized per process
 
-class Page(object):
+# crawling
+MaxConcurrentRequests = 32 # max. number of in-flight HTTP requests
+RequestTimeout = (3, 10) # (connect, read) seconds
+RequestDelay = 0.15 # min. number of seconds between two requests (politeness)
+MaxContentLength = 4 * 1024 * 1024 # max. number of bytes read per page
+
+
+def parse_page(domain_netloc, url, content, encoding=None):
     '''
-    Page of a website.
+    Parse a page's HTML content.
+
+    The result only holds plain tuples & strings so that pages can be parsed
+    in other processes.
+
+    @param domain_netloc: (str) base domain's network location
+                          (e.g. "example.com").
+    @param url: (str) page's url without the domain.
+    @param content: (str|bytes) HTML content of the page.
+    @param encoding: (str) content's encoding, if given as bytes (optional,
+                     defaults to UTF-8).
+    @return: (tuple) page's title, assets, form actions, internal links,
+             external links & other links.
     '''
-    def __init__(self, domain, url, content):
-        '''
-        @param domain: (str) base domain.
-        @param url: (str) page's url without the domain.
-        @param content: (str) HTML content of the page.
-        '''
-        super(Page, self).__init__()
-        
-        domain = domain.strip().lower() # just to be safe
-        
-        self.__url = url
-        
-        # find the page's title
-        match = HtmlTitleTagRegex.search(content)
-        self.__title = match.group('title').strip() if match is not None \
-                        else 'No title'
-        
-        # find assets
-        self.__assets = []
-        for match in HtmlSrcAttrRegex.finditer(content):
-            self.__assets.append(match.group('src').strip())
-        
-        # find form actions
-        self.__actions = []
-        for match in HtmlActionAttrRegex.finditer(content):
-            self.__actions.append(match.group('action').strip())
-
-        # find links
-        self.__internal_links = []
-        self.__external_links = []
-        self.__other_links = []
-        domain_netloc = urlsplit(domain)[1]
-        for match in HtmlHrefAttrRegex.finditer(content):
-            href = match.group('href')
-            text = match.group('text')
+    if isinstance(content, bytes):
+        try:
+            content = content.decode(encoding or 'utf-8', 'replace')
+        except LookupError: # unknown encoding
+            content = content.decode('utf-8', 'replace')
+
+    # (sets reject duplicates as they are found)
+    title = None
+    assets = set()
+    actions = set()
+    internal_links = set()
+    external_links = set()
+    other_links = set()
+    add = {
+        'asset': assets.add,
+        'action': actions.add,
+        'internal_link': internal_links.add,
+        'external_link': external_links.add,
+        'other_link': other_links.add,
+    }
+    for (kind, value) in iter_page_urls(domain_netloc, url, content):
+        if kind != 'title':
+            add[kind](value)
+        elif title is None:
+            title = value
+
+    # make read-only, sorted for a stable output
+    return (title if title is not None else 'No title',
+            tuple(sorted(assets)),
+            tuple(sorted(actions)),
+            tuple(sorted(internal_links)),
+            tuple(sorted(external_links)),
+            # (rel may be None, which does not compare with strings)
+            tuple(sorted(other_links,
+                         key=lambda link: (link[0], link[1] or ''))))
+
+
+def iter_page_urls(domain_netloc, url, content):
+    '''
+    Find the title & URLs of a page's HTML content.
+
+    @param domain_netloc: (str) base domain's network location.
+    @param url: (str) page's url without the domain.
+    @param content: (str) HTML content of the page.
+    @return: (generator) of (kind, value) tuples, kind being one of
+             'title', 'asset', 'action', 'internal_link', 'external_link'
+             or 'other_link'.
+    '''
+    # bind the globals used per match as locals (faster lookups)
+    _normalize_url = normalize_url
+    is_non_page_url = NonPageUrlRegex.match
+    is_static_file = StaticFileRegex.search
+    find_url_attrs = UrlAttrRegex.findall
+
+    for match in HtmlTagRegex.finditer(content):
+        # fetch all groups in a single call
+        (title, tag, rel, attrs, text) = \
+            match.group('title', 'tag', 'rel', 'attrs', 'text')
+
+        if title is not None:
+            yield ('title', title.strip())
+            continue
+
+        tag = tag.lower()
+        is_stylesheet = tag == 'link' and rel is not None \
+                            and rel.lower() == 'stylesheet'
+
+        # a tag may carry several URL attributes (e.g. src & formaction)
+        for (attr, href) in find_url_attrs(attrs):
+            if is_non_page_url(href) is not None:
+                continue
+
+            # the regex only matches href, src & (form)action: their first
+            # letter tells them apart without lower-casing them
+            if attr[0] in 'sS':
+                yield ('asset', href.strip())
+                continue
+            elif attr[0] not in 'hH':
+                yield ('action', href.strip())
+                continue
 
             # filter out in-page references
             if len(href) == 0 or href[0] == '#':
                 continue
 
-            scheme, netloc, path, _, _ = urlsplit(href)
-            # check for external URLs
-            if len(netloc) > 0 and netloc != domain_netloc:
-                href = urlunsplit((scheme, netloc, path, '', ''))
-                if match.group('tag').lower() == 'a':
-                    self.__external_links.append((href, text))
-                elif match.group('tag').lower() == 'link' and match.group('rel').lower() == 'stylesheet':
-                    self.__assets.append(href)
-                else:
-                    self.__other_links.append((href, match.group('rel')))
+            normalized = _normalize_url(href, domain_netloc)
+            if normalized is None:
                 continue
-            
-            # filter out useless URLs
-            if scheme in ('mailto', 'tel', 'javascript') or len(path) == 0:
+            (is_external, link, is_relative) = normalized
+
+            if is_external:
+                if tag == 'a':
+                    yield ('external_link', (link, text))
+                elif is_stylesheet:
+                    yield ('asset', link)
+                else:
+                    yield ('other_link', (link, rel))
                 continue
 
-            if path[0] != '/':
-                logging.warn("Unsupported relative path (%s) at %s", path, url)
+            if is_relative:
+                logging.warning("Unsupported relative path (%s) at %s",
+                                href, url)
 
-            # create absolute path ignoring query & fragment parameters
-            href = urlunsplit(('', '', '/%s' % path.lstrip('/'), '', ''))
-            
             # ignore links to self
-            if href == self.__url:
+            if link == url:
                 continue
-            
-            if match.group('tag').lower() == 'a':
-                self.__internal_links.append((href, text))
-            elif match.group('tag').lower() == 'link' and match.group('rel').lower() == 'stylesheet':
-                self.__assets.append(href)
+
+            if tag == 'a':
+                # links to static files are assets, not pages to crawl
+                if is_static_file(link) is not None:
+                    yield ('asset', link)
+                    continue
+                yield ('internal_link', (link, text))
+            elif is_stylesheet:
+                yield ('asset', link)
             else:
-                self.__other_links.append((href, match.group('rel')))
+                yield ('other_link', (link, rel))
+
+
+@lru_cache(maxsize=UrlCacheSize)
+def normalize_url(href, domain_netloc):
+    '''
+    Normalize a link's URL, ignoring its query & fragment parameters.
+
+    Memoized, as most links (navigation, footer, ...) repeat on every page.
+
+    @param href: (str) link's URL, as found in the page.
+    @param domain_netloc: (str) base domain's network location.
+    @return: (tuple) (is_external, url, is_relative): url is absolute for
+             external links and an absolute path otherwise. None if the
+             link has no path.
+    '''
+    if href[0] == '/' and href[1:2] != '/':
+        # absolute path, by far the most common: no need for urlsplit
+        scheme = netloc = ''
+        path = href.split('?', 1)[0].split('#', 1)[0]
+    else:
+        scheme, netloc, path, _, _ = urlsplit(href)
+
+    # check for external URLs (host names are case-insensitive, unlike
+    # the rest of the URL, so only the netloc gets lower-cased)
+    if len(netloc) > 0 and netloc.lower() != domain_netloc:
+        return (True, '%s//%s%s' % (scheme + ':' if len(scheme) > 0 else '',
+                                    netloc, path), False)
+
+    # filter out useless URLs
+    if len(path) == 0:
+        return None
+
+    # create absolute path
+    return (False, '/' + path.lstrip('/'), path[0] != '/')
 
-        # remove duplicates & make read-only
-        self.__assets = tuple(OrderedDict.fromkeys(self.__assets).keys())
-        self.__actions = tuple(OrderedDict.fromkeys(self.__actions).keys())
-        self.__internal_links = tuple(OrderedDict.fromkeys(self.__internal_links).keys())
-        self.__external_links = tuple(OrderedDict.fromkeys(self.__external_links).keys())
-        self.__other_links = tuple(OrderedDict.fromkeys(self.__other_links).keys())
+
+class Page(object):
+    '''
+    Page of a website.
+    '''
+    __slots__ = ('__url', '__title', '__assets', '__actions',
+                 '__internal_links', '__external_links', '__other_links',
+                 '__links')
+
+    def __init__(self, url, parsed, known_urls=None):
+        '''
+        @param url: (str) page's url without the domain.
+        @param parsed: (tuple) page's parsed HTML content, as returned by
+                       parse_page().
+        @param known_urls: (dict) {url: url} of URLs already known, whose
+                           string is shared by the internal links to them.
+        '''
+        super(Page, self).__init__()
+        
+        self.__url = url
+        (self.__title, self.__assets, self.__actions, self.__internal_links,
+            self.__external_links, self.__other_links) = parsed
+
+        if known_urls is not None:
+            self.__internal_links = tuple((known_urls.get(link, link), text) \
+                                for (link, text) in self.__internal_links)
+        self.__links = self.__internal_links + self.__external_links
 
     @property
     def title(self):
@@ -129,7 +262,7 @@ class Page(object):
         
         @return: (tuple).
         '''
-        return copy(self.__assets)
+        return self.__assets
     
     @property
     def actions(self):
@@ -138,7 +271,7 @@ class Page(object):
 
         @return: (tuple).
         '''
-        return copy(self.__actions)
+        return self.__actions
 
     @property
     def links(self):
@@ -147,7 +280,7 @@ class Page(object):
         
         @return: (tuple).
         '''
-        return copy(self.__internal_links + self.__external_links)
+        return self.__links
     
     @property
     def internal_links(self):
@@ -156,7 +289,7 @@ class Page(object):
         
         @return: (tuple).
         '''
-        return copy(self.__internal_links)
+        return self.__internal_links
     
     @property
     def external_links(self):
@@ -165,7 +298,7 @@ class Page(object):
         
         @return: (tuple).
         '''
-        return copy(self.__external_links)
+        return self.__external_links
 
     @property
     def other_links(self):
@@ -174,16 +307,34 @@ class Page(object):
 
         @return: (tuple).
         '''
-        return copy(self.__other_links)
+        return self.__other_links
 
 
 class Sitemap(object):
     '''
     Website's sitemap.
     '''
-    def __init__(self, domain):
+    __slots__ = ('__domain', '__domain_netloc', '__pages', '__delay',
+                 '__delay_lock', '__next_request_time')
+
+    def __init__(self, domain, max_pages=None, max_depth=None, include=None,
+                 delay=RequestDelay, parse_processes=None):
         '''
         @param domain: (str).
+        @param max_pages: (int) max. number of pages to crawl (optional).
+        @param max_depth: (int) max. number of links to follow away from the
+                          home page (optional).
+        @param include: (str) regex the URLs of the crawled pages must match,
+                        the home page excepted (optional).
+        @param delay: (float) min. number of seconds between the start of two
+                      requests, to go easy on the server.
+        @param parse_processes: (int) number of processes to parse the pages
+                                in, if parsing outpaces fetching (optional,
+                                pages are parsed in the fetching threads by
+                                default). The processes are spawned & import
+                                the main module: scripts using it must create
+                                the Sitemap under an
+                                "if __name__ == '__main__':" guard.
         '''
         super(Sitemap, self).__init__()
         
@@ -191,9 +342,14 @@ class Sitemap(object):
         if len(arr[0]) == 0:
             raise TypeError('Domain name must include "http(s)://".')
         self.__domain = '%s://%s' % (arr[0], arr[1])
-        self.__pages = OrderedDict() # {url: Page}
+        self.__domain_netloc = arr[1].lower() # shared by all pages
+        self.__pages = {} # {url: Page}, in crawl order
+
+        self.__delay = delay
+        self.__delay_lock = Lock()
+        self.__next_request_time = 0
         
-        self.__crawl()
+        self.__crawl(max_pages, max_depth, include, parse_processes)
     
     def __str__(self):
         '''
@@ -201,95 +357,226 @@ class Sitemap(object):
         
         @return: (str).
         '''
-        s = ['Sitemap for %s:\n' % self.__domain.encode('utf-8')]
+        return ''.join(self.__lines())
+
+    def __lines(self):
+        '''
+        Generate the sitemap's text lines.
+
+        @return: (generator) of (str).
+        '''
+        yield 'Sitemap for %s:\n' % self.__domain
         
-        for page in self.__pages.itervalues():
-            s.append('\t-> %s (%s)\n' % (page.title.encode('utf-8'), page.url.encode('utf-8')))
+        for page in self.__pages.values():
+            yield '\t-> %s (%s)\n' % (page.title, page.url)
             
-            s.append('\t   Static assets:\n')
+            yield '\t   Static assets:\n'
             assets = page.assets
             if len(assets) > 0:
-                for asset in assets:
-                    s.append('\t\t%s\n' % asset.encode('utf-8'))
+                # one line per item, joined in C
+                yield '\t\t%s\n' % '\n\t\t'.join(assets)
             else:
-                s.append('\t\tNone.\n')
+                yield '\t\tNone.\n'
 
-            s.append('\t   Links:\n')
+            yield '\t   Links:\n'
             links = page.links
             if len(links) > 0:
-                for (link, text) in sorted(links):
-                    s.append('\t\t%s - %s\n' % (link.encode('utf-8'), text.encode('utf-8')))
+                yield ''.join(['\t\t%s - %s\n' % link \
+                                for link in sorted(links)])
             else:
-                s.append('\t\tNone.\n')
+                yield '\t\tNone.\n'
 
             actions = page.actions
             if len(actions) > 0:
-                s.append('\t   Form actions:\n')
-                for action in actions:
-                    s.append('\t\t%s\n' % action.encode('utf-8'))
+                yield '\t   Form actions:\n'
+                yield '\t\t%s\n' % '\n\t\t'.join(actions)
 
             other_links = page.other_links
             if len(other_links) > 0:
-                s.append('\t   Other links:\n')
+                yield '\t   Other links:\n'
                 for (link,rel) in other_links:
                     if rel is None:
-                        s.append('\t\t%s\n' % link.encode('utf-8'))
+                        yield '\t\t%s\n' % link
                     else:
-                        s.append('\t\t[rel=%s] %s\n' % (rel.encode('utf-8'), link.encode('utf-8')))
-
-        return ''.join(s)
+                        yield '\t\t[rel=%s] %s\n' % (rel, link)
     
-    def __crawl(self):
+    def __crawl(self, max_pages=None, max_depth=None, include=None,
+                parse_processes=None):
         '''
         Crawl the given domain and create the sitemap.
+
+        Up to MaxConcurrentRequests pages are loaded at once so that the
+        network round-trips overlap; pages are added in crawl order.
+
+        @param max_pages: (int) max. number of pages to crawl (optional).
+        @param max_depth: (int) max. number of links to follow away from the
+                          home page (optional).
+        @param include: (str) regex the URLs of the crawled pages must match,
+                        the home page excepted (optional).
+        @param parse_processes: (int) number of processes to parse the pages
+                                in (optional).
         '''
-        urls_to_check = deque(['/'])
-        while True:
-            try:
-                url = urls_to_check.popleft()
-            except:
-                break # no more URLs to check
-            
-            response = requests.get( \
-                        urljoin(self.__domain, url, allow_fragments=False))
-            try:
-                response.raise_for_status()
-                assert response.status_code == 200
-                if 'video' in response.headers.get('content-type'):
+        # resolve the limits once so the loop only compares numbers
+        if max_pages is None:
+            max_pages = float('inf')
+        if max_depth is None:
+            max_depth = float('inf')
+        if include is not None:
+            include = re.compile(include)
+
+        urls_to_check = deque([('/', 0)]) # (url, depth)
+        # every URL ever queued, mapped to itself so that all pages share a
+        # single string per URL
+        urls_seen = {'/': '/'}
+        # pages being loaded, in crawl order: (url, depth, future)
+        loading = deque()
+        # fetching is I/O bound & done in threads. Parsing is CPU bound &, on
+        # request, done in processes to get around the GIL; they are first
+        # started from a fetching thread, so they are spawned rather than
+        # forked: forking a multi-threaded process may deadlock the child.
+        if parse_processes is None:
+            parse_pool = nullcontext() # parse in the fetching threads
+        else:
+            parse_pool = ProcessPoolExecutor(max_workers=parse_processes,
+                            mp_context=multiprocessing.get_context('spawn'))
+        # reuse connections across requests (keep-alive), keeping one open
+        # connection per concurrent request; they are closed with the session
+        # once the crawl is done
+        adapter = HTTPAdapter(pool_maxsize=MaxConcurrentRequests, max_retries=0)
+        with requests.Session() as session, \
+                ThreadPoolExecutor(max_workers=MaxConcurrentRequests) \
+                as fetch_pool, parse_pool as parse_pool:
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+
+            while True:
+                # keep up to MaxConcurrentRequests pages in flight
+                while len(urls_to_check) > 0 \
+                        and len(loading) < MaxConcurrentRequests \
+                        and len(self.__pages) + len(loading) < max_pages:
+                    (url, depth) = urls_to_check.popleft()
+                    loading.append((url, depth, fetch_pool.submit( \
+                        self.__load, session, parse_pool, url)))
+                if len(loading) == 0:
+                    break # no more URLs to check
+
+                (url, depth, parsed) = loading.popleft()
+                parsed = parsed.result()
+                if parsed is None:
                     continue
-                # only crawl HTML pages
-                assert 'html' in response.headers.get('content-type') 
-            except:
-                logging.exception("Error getting %s", url)
-                continue
-            
-            try:
-                page = self.__create_page_for(url, response.text)
-                
-                for (link, text) in page.internal_links:
-                    try:
-                        # ignore URLs already crawled or already in queue
-                        assert link not in self.__pages \
-                            and link not in urls_to_check
-                        urls_to_check.append(link)
-                    except AssertionError:
-                        pass
-            except errors.PageExistsError:
-                pass
+
+                try:
+                    page = self.__create_page_for(url, parsed, urls_seen)
+                    if depth >= max_depth:
+                        continue
+
+                    for (link, text) in page.internal_links:
+                        # ignore URLs already crawled, being crawled or
+                        # already in queue
+                        if link not in urls_seen and (include is None \
+                                or include.search(link) is not None):
+                            urls_seen[link] = link
+                            urls_to_check.append((link, depth + 1))
+                except errors.PageExistsError:
+                    pass
+
+    def __load(self, session, parse_pool, url):
+        '''
+        Fetch & parse the page of an URL.
+
+        Runs in a fetching thread, which either parses the page itself or
+        hands the parsing over to a parser process.
+
+        @param session: (requests.Session) session to send the request with.
+        @param parse_pool: (ProcessPoolExecutor) parser processes (None to
+                           parse the page in the current thread).
+        @param url: (str) page's URL.
+        @return: (tuple) page's parsed HTML content, as returned by
+                 parse_page(), or None if the URL could not be fetched or is
+                 not an HTML page.
+        '''
+        fetched = self.__fetch(session, url)
+        if fetched is None:
+            return None
+
+        (content, encoding) = fetched
+        if parse_pool is None:
+            return parse_page(self.__domain_netloc, url, content, encoding)
+
+        # the raw bytes are decoded by the parser process: they are cheaper
+        # to send over than text and the decoding is done outside of the GIL
+        return parse_pool.submit(parse_page, self.__domain_netloc, url,
+                                 content, encoding).result()
+
+    def __fetch(self, session, url):
+        '''
+        Fetch the HTML content of an URL.
+
+        @param session: (requests.Session) session to send the request with.
+        @param url: (str) page's URL.
+        @return: (tuple) page's undecoded HTML content (bytes) & its encoding
+                 according to the response headers, or None if the URL could
+                 not be fetched or is not an HTML page.
+        '''
+        # crawled URLs are absolute paths, which need no RFC 3986 resolution
+        full_url = self.__domain + url if url[:1] == '/' \
+                    else urljoin(self.__domain, url, allow_fragments=False)
+
+        self.__wait_for_turn()
+
+        response = None
+        try:
+            # only download the body once the headers have been checked
+            response = session.get(full_url, timeout=RequestTimeout,
+                                   stream=True)
+            content_type = response.headers.get('content-type', '')
+            if response.status_code != 200:
+                logging.error("Error getting %s: HTTP %d", url,
+                              response.status_code)
+                return None
+            # only crawl HTML pages
+            if 'html' not in content_type:
+                if 'video' not in content_type:
+                    logging.error("Error getting %s: not an HTML page (%s)",
+                                  url, content_type)
+                return None
+
+            content = response.raw.read(MaxContentLength, decode_content=True)
+        except Exception:
+            logging.exception("Error getting %s", url)
+            return None
+        finally:
+            if response is not None:
+                response.close()
+
+        return (content, response.encoding)
     
-    def __create_page_for(self, url, content):
+    def __wait_for_turn(self):
+        '''
+        Block until a new request may be sent, so that requests to the
+        server start at least self.__delay seconds apart.
+        '''
+        with self.__delay_lock:
+            now = time.time()
+            if self.__next_request_time > now:
+                time.sleep(self.__next_request_time - now)
+                now = self.__next_request_time
+            self.__next_request_time = now + self.__delay
+
+    def __create_page_for(self, url, parsed, known_urls=None):
         '''
         Create a page for an URL.
         
         @param url: (str) page's URL.
-        @param content: (str) page's HTML content.
+        @param parsed: (tuple) page's parsed HTML content.
+        @param known_urls: (dict) {url: url} of URLs already known.
         @return: (Page).
         @raise PageExistsError: if a page already exists for the same URL.
         '''
         if url in self.__pages:
             raise errors.PageExistsError()
         
-        page = Page(self.__domain, url, content)
+        page = Page(url, parsed, known_urls)
         self.__pages[url] = page
         
         return page